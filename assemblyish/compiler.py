@@ -22,15 +22,35 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from typing import List
+from functools import lru_cache
+from typing import Final, List, Optional
 
 from .parser import Token
 from .errors import CompilationError
 from .instruction import GOTO, VAR, instructions
 
 
+_MAX_STR_LEN: Final[int] = 1 << 32
+_MAX_INT: Final[int] = 1 << 64
+
+
+def _err(token: Token, msg: str) -> CompilationError:
+    return CompilationError(token.line, token.index, msg)
+
+
+def _arg_err(line: List[Token], msg: str) -> CompilationError:
+    return _err(line[1] if len(line) > 1 else line[0], msg)
+
+
+@lru_cache(maxsize=4096)
+def _encode_int(integer: int) -> bytes:
+    return b"\xfe" + integer.to_bytes(8, "big")
+
+
 class Compilable:
-    def __init__(self, byte: int, line: int, index: int, args: List[Token], resolved_vars: dict = {}, resolved_gotos: dict = {}):
+    __slots__ = ("byte", "args", "line", "index", "vars", "gotos")
+
+    def __init__(self, byte: int, line: int, index: int, args: List[Token], resolved_vars: Optional[dict] = None, resolved_gotos: Optional[dict] = None):
         """Represents a compilable line.
 
         Args:
@@ -43,69 +63,61 @@ class Compilable:
         self.line = line
         self.index = index
 
-        self.vars = resolved_vars
-        self.gotos = resolved_gotos
+        self.vars = resolved_vars if resolved_vars is not None else {}
+        self.gotos = resolved_gotos if resolved_gotos is not None else {}
 
-    def compile(self):
-        compiled_bytes = [self.byte]
+    def compile(self, out: bytearray):
+        out.append(self.byte)
 
-        is_goto = self.byte == 0b11111001
+        handlers = self.goto_handlers if self.byte == GOTO.byte else self.handlers
 
         for arg in self.args:
-            if arg.type == "STR":
-                compiled_bytes.extend(self.compile_string(arg.value))
-            if arg.type == "IDT":
-                if is_goto:
-                    compiled_bytes.extend(self.make_bytes(self.gotos[arg.value], 8))
-                    is_goto = False
-                    continue
-                compiled_bytes.extend(self.make_bytes(self.vars[arg.value], 8))
-            if arg.type == "NUM":
-                num = int(arg.value)
-                compiled_bytes.extend(self.compile_int(num))
-
-        print(compiled_bytes)
-
-        return compiled_bytes
+            handlers[arg.type](self, arg.value, out)
 
-    def compile_string(self, string: str):
-        string_bytes = [0b11111101]
+    def compile_identifier(self, name: str, out: bytearray):
+        out += self.vars[name]
 
-        for letter in string:
-            if ord(letter) > 255:
-                raise CompilationError(self.line, self.index, f"Invalid character: {ord(letter)}")
+    def compile_goto(self, name: str, out: bytearray):
+        out += self.gotos[name]
 
-        length = len(string)
+    def compile_number(self, value, out: bytearray):
+        self.compile_int(int(value), out)
 
-        if length > 2**32:
-            raise CompilationError(self.line, self.index, f"String too long. ({length} > {2**32})")
+    def compile_string(self, string: str, out: bytearray):
+        try:
+            data = string.encode("latin-1")
+        except UnicodeEncodeError as e:
+            raise CompilationError(self.line, self.index, f"Invalid character: {ord(string[e.start])}")
 
-        string_bytes.extend(self.make_bytes(length, 4))
+        length = len(data)
 
-        string_bytes.extend([ord(c) for c in string])
+        if length >= _MAX_STR_LEN:
+            raise CompilationError(self.line, self.index, f"String too long. ({length} >= {_MAX_STR_LEN})")
 
-        return string_bytes
+        out.append(0b11111101)
+        out += self.make_bytes(length, 4)
+        out += data
 
-    def compile_int(self, integer: int):
-        int_bytes = [0b11111110]
+    def compile_int(self, integer: int, out: bytearray):
+        if integer >= _MAX_INT:
+            raise CompilationError(self.line, self.index, f"Integer too large. ({integer} >= {_MAX_INT})")
 
-        if integer > 2**64:
-            raise CompilationError(self.line, self.index, f"Integer too large. ({integer} > {2**64})")
-
-        int_bytes.extend(self.make_bytes(integer, 8))
-
-        return int_bytes
+        try:
+            out += _encode_int(integer)
+        except OverflowError:
+            raise CompilationError(self.line, self.index, f"Integer out of range. ({integer})")
 
     @staticmethod
-    def make_bytes(num: int, length: int):
-        bs = hex(num)[2:].zfill(length * 2)
-
-        out = []
+    def make_bytes(num: int, length: int) -> bytes:
+        return num.to_bytes(length, "big")
 
-        for i in range(length):
-            out.append(int(bs[i*2:i*2+2], 16))
+    handlers = {
+        "IDT": compile_identifier,
+        "NUM": compile_number,
+        "STR": compile_string,
+    }
 
-        return out
+    goto_handlers = {**handlers, "IDT": compile_goto}
 
 
 class Compiler:
@@ -129,45 +141,70 @@ class Compiler:
 
         self.lines = self.getlines()
 
-    def compile(self):
+    @classmethod
+    def from_lines(cls, filename: str, lines: List[List[Token]]) -> "Compiler":
+        """Create a compiler from tokens already grouped by line.
+
+        Args:
+            filename (str): The filename of the file being compiled. Used for error logging.
+            lines (List[List[Token]]): The program's lines of tokens, as returned by Parser.parse_lines. The compiler's tokens attribute is left empty.
+        """
+
+        compiler = cls(filename, [])
+        compiler.lines = lines
+        return compiler
+
+    def compile(self, debug: bool = False):
         for line in self.lines:
-            if line[0].type == "IDT":
-                instruction = instructions.get(line[0].value)
+            head = line[0]
+
+            if head.type == "IDT":
+                instruction = instructions.get(head.value)
 
                 if not instruction:
-                    raise CompilationError(line[0].line, line[0].index, f"Not a valid instruction: {line[0].value}.")
-
-                if not instruction.match(line[1:]):
-                    raise CompilationError(line[1].line, line[1].index, f"Argument signature doesn't match.")
-
-                for token in line[1:]:
-                    if line[0].value != "GOTO":
-                        if token.type == "IDT" and token.value not in self.variables:
-                            raise CompilationError(line[1].line, line[1].index, f"Variable referenced before definition.")
-                    else:
-                        if token.type == "IDT" and token.value not in self.gotos:
-                            raise CompilationError(line[1].line, line[1].index, f"Goto referenced before definition.")
-
-                self.instrs.append(Compilable(instruction.byte, line[0].line, line[0].index, line[1:], self.variables, self.gotos))
-            elif line[0].type == "VAR":
-                if not VAR.match(line[1:]):
-                    raise CompilationError(line[1].line, line[1].index, f"Variable definition does not match correct signature.")
-                self.variables[line[1].value] = id = self.var_goto_id
+                    raise _err(head, f"Not a valid instruction: {head.value}.")
+
+                if not instruction.match(line, 1):
+                    raise _arg_err(line, "Argument signature doesn't match.")
+
+                if head.value != "GOTO":
+                    defined, kind = self.variables, "Variable"
+                else:
+                    defined, kind = self.gotos, "Goto"
+
+                args = line[1:]
+
+                for token in args:
+                    if token.type == "IDT" and token.value not in defined:
+                        raise _err(token, f"{kind} referenced before definition.")
+
+                self.instrs.append(Compilable(instruction.byte, head.line, head.index, args, self.variables, self.gotos))
+            elif head.type == "VAR":
+                if not VAR.match(line, 1):
+                    raise _arg_err(line, "Variable definition does not match correct signature.")
+                id = self.var_goto_id
+                self.variables[line[1].value] = Compilable.make_bytes(id, 8)
                 self.var_goto_id += 1
-                self.instrs.append(Compilable(VAR.byte, line[0].line, line[0].index, [Token("NUM", 0, 0, id)]))
-            elif line[0].type == "GOTO":
-                if not GOTO.match(line[1:]):
-                    raise CompilationError(line[1].line, line[1].index, f"Goto definition does not match correct signature.")
-                self.gotos[line[1].value] = id = self.var_goto_id
+                self.instrs.append(Compilable(VAR.byte, head.line, head.index, [Token("NUM", 0, 0, id)]))
+            elif head.type == "GOTO":
+                if not GOTO.match(line, 1):
+                    raise _arg_err(line, "Goto definition does not match correct signature.")
+                id = self.var_goto_id
+                self.gotos[line[1].value] = Compilable.make_bytes(id, 8)
                 self.var_goto_id += 1
-                self.instrs.append(Compilable(GOTO.byte, line[0].line, line[0].index, [Token("NUM", 0, 0, id)]))
+                self.instrs.append(Compilable(GOTO.byte, head.line, head.index, [Token("NUM", 0, 0, id)]))
             else:
-                raise CompilationError(line[0].line, line[0].index, f"Lines must start with an identifier, variable declaration (.), or goto (:).")
+                raise _err(head, "Lines must start with an identifier, variable declaration (.), or goto (:).")
 
-        code = []
+        code = bytearray()
 
         for c in self.instrs:
-            code.extend(c.compile())
+            if debug:
+                start = len(code)
+                c.compile(code)
+                print(f"[DEBUG] {str(c.line).zfill(6)} :: {list(code[start:])}")
+            else:
+                c.compile(code)
 
         return code
 
@@ -176,7 +213,7 @@ class Compiler:
             self.save_to_file(f)
 
     def save_to_file(self, writable):
-        writable.write(bytes(self.compile()))
+        writable.write(self.compile())
 
     def getlines(self) -> List[List[Token]]:
         lines = []
@@ -6,7 +6,7 @@ from .parser import Token
 
 class Argument:
     def __init__(self, *types: List[str], required: bool = True):
-        self.types = types
+        self.types = frozenset(types)
         self.required = required
 
     def match(self, thing):
@@ -24,16 +24,17 @@ class Instruction:
         self.byte = byte
         self.args = args
 
-    def match(self, line: List[Token]):
-        if len(line) > len(self.args):
+    def match(self, line: List[Token], start: int = 0):
+        count = len(line) - start
+        if count > len(self.args):
             return False
         for i, arg in enumerate(self.args):
-            if i == len(line):
+            if i == count:
                 if not arg.required:
                     return True
                 else:
                     return False
-            if not arg.match(line[i]):
+            if not arg.match(line[start + i]):
                 return False
         return True
 
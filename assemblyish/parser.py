@@ -22,17 +22,26 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
-from re import compile, MULTILINE
+from re import compile
+from sys import intern
 
 from .errors import LexingError, UnexpectToken
 
 
 class Token:
-    identifier = compile(r"\w*")
-    number = compile(r"\d*")
-    comment = compile(r";.*")
-    string = compile(r"\"(?:\\.|[^\"\\])*\"")
-    whitespace = compile(r"(^)? *(\r?\n)?", MULTILINE)
+    __slots__ = ("type", "line", "index", "value")
+
+    pattern = compile(
+        r"(?P<NUM>\d+)"
+        r"|(?P<IDT>[^\W\d_]\w*)"
+        r"|(?P<STR>\"[^\"\\]*(?:\\.[^\"\\]*)*\")"
+        r"|(?P<COM>;.*)"
+        r"|(?P<VAR>\.)"
+        r"|(?P<GOTO>:)"
+        r"|(?P<NEWLINE>\n)"
+        r"|(?P<WS>[^\S\n]+)"
+        r"|(?P<ERR>.)"
+    )
 
     def __init__(self, type: str, line: int, index: int, value = None):
         """A token class representing a single parsed token.
@@ -76,69 +85,73 @@ class Parser:
             raise LexingError(0, 0, "Code must end with a newline.")
 
     def parse(self, include_extra: bool = False, debug: bool = False):
-        symbols = [Token("START", 0, 0)]
+        symbols = [Token("START", 0, 0)] if include_extra else []
+        append = symbols.append
 
-        while symbols[-1].type != "EOF":
-            token = self.next()
-            symbols.append(token)
+        for token in self.tokenize(debug):
+            if token.type != "COM" or include_extra:
+                append(token)
 
-            if debug:
-                print(f"[DEBUG] {str(len(symbols)).zfill(6)} :: {token}")
+        if include_extra:
+            append(Token("EOF", self.line, self.index))
 
-        if not include_extra:
-            symbols = [symbol for symbol in symbols if symbol.type not in ["START", "EOF", "COM"]]
+        return symbols
 
-        out = []
-        for symbol in symbols:
-            if symbol.type == "STR":
-                symbol.value = symbol.value[1:-1]
-            out.append(symbol)
+    def parse_lines(self, debug: bool = False):
+        """Parse the code into non-empty lines of tokens, without comments."""
+        lines = []
+        line = []
+        append = line.append
 
-        return symbols
+        for token in self.tokenize(debug):
+            if token.type == "NEWLINE":
+                if line:
+                    lines.append(line)
+                    line = []
+                    append = line.append
+            elif token.type != "COM":
+                append(token)
+
+        if line:
+            lines.append(line)
+
+        return lines
+
+    def tokenize(self, debug: bool = False):
+        """Lex the code, yielding every token including newlines and comments."""
+        self.index = 0
+        self.line = 0
+        self.finished = False
+        count = 1
+
+        for match in Token.pattern.finditer(self.code, 0, len(self.code) - 1):
+            ltype = match.lastgroup
+
+            if ltype == "WS":
+                continue
+
+            if ltype == "IDT":
+                token = Token(ltype, self.line, match.end(), intern(match.group().upper()))
+            elif ltype == "NUM":
+                token = Token(ltype, self.line, match.end(), match.group())
+            elif ltype == "STR":
+                token = Token(ltype, self.line, match.end(), match.group()[1:-1])
+            elif ltype == "NEWLINE":
+                self.line += 1
+                token = Token(ltype, self.line, match.end())
+            elif ltype == "COM":
+                token = Token(ltype, self.line, match.end(), match.group())
+            elif ltype == "ERR":
+                raise UnexpectToken(self.line, match.start(), f"Unexpected token: {match.group()}")
+            else:
+                token = Token(ltype, self.line, match.end())
+
+            count += 1
+
+            if debug:
+                print(f"[DEBUG] {str(count).zfill(6)} :: {token}")
+
+            yield token
 
-    def next(self):
-        if self.index == len(self.code) - 1:
-            self.finished = True
-            return Token("EOF", self.line, self.index)
-
-        char = self.code[self.index]
-
-        if char.isalpha():
-            return self.process_identifier()
-        elif char.isdigit():
-            return self.process_regex(Token.number, "NUM")
-        elif char == ";":
-            return self.process_regex(Token.comment, "COM")
-        elif char == "\"":
-            return self.process_regex(Token.string, "STR")
-        elif char == ".":
-            self.index += 1
-            return Token("VAR", self.line, self.index)
-        elif char == ":":
-            self.index += 1
-            return Token("GOTO", self.line, self.index)
-        elif char.isspace():
-            return self.process_whitespace()
-        else:
-            raise UnexpectToken(self.line, self.index, f"Unexpected token: {char}")
-
-    def process_identifier(self) -> Token:
-        i = Token.identifier.search(self.code, pos=self.index)
-        self.index = i.end()
-        name = i.group()
-        return Token("IDT", self.line, self.index, name.upper())
-
-    def process_regex(self, regex, ltype: str) -> Token:
-        """Get one regex based token."""
-        d = regex.search(self.code, pos=self.index)
-        self.index = d.end()
-        return Token(ltype, self.line, self.index, d.group())
-
-    def process_whitespace(self) -> Token:
-        """Handle newlines and indentation"""
-        ws = Token.whitespace.search(self.code, pos=self.index)
-        self.index = ws.end()
-        if ws.group(2) is not None:
-            self.line += 1
-            return Token("NEWLINE", self.line, self.index)
-        return self.next()
+        self.index = len(self.code) - 1
+        self.finished = True